@@ -5,11 +5,26 @@ Now with Supabase authentication and cloud storage.
 """
 
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+from features import FeatureCache, build_trends, top_themes
+from journal import (
+    INDEX_COLUMNS,
+    PROMPTS,
+    RATING_LABELS,
+    calculate_stats,
+    get_week_dates,
+    get_week_key,
+    has_bodies,
+    query_reflections,
+    row_to_entry,
+)
+from prefetch import WeekPrefetcher, weeks_to_prefetch
+
 # Load environment variables
 load_dotenv()
 
@@ -30,15 +45,12 @@ supabase = get_supabase_client()
 
 # --- Configuration ---
 EMOJI_RATINGS = ["1", "2", "3", "4", "5"]
-EMOJI_DISPLAY = {
-    "1": "Rough",
-    "2": "Meh",
-    "3": "Okay",
-    "4": "Good",
-    "5": "Great"
-}
+EMOJI_DISPLAY = RATING_LABELS
 EMOJI_ICONS = {"1": "1", "2": "2", "3": "3", "4": "4", "5": "5"}
 
+# Prefetching
+PREFETCH_WORKERS = 4
+
 # --- Page Configuration ---
 st.set_page_config(
     page_title="Weekly Reflection Journal",
@@ -249,37 +261,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# --- Helper Functions ---
-def get_week_key(date: datetime = None) -> str:
-    """Get ISO week key (e.g., '2026-W03')."""
-    if date is None:
-        date = datetime.now()
-    return f"{date.isocalendar()[0]}-W{date.isocalendar()[1]:02d}"
-
-
-def parse_week_key(week_key: str) -> tuple:
-    """Parse week key to (year, week_number)."""
-    parts = week_key.split("-W")
-    return int(parts[0]), int(parts[1])
-
-
-def get_week_dates(week_key: str) -> tuple:
-    """Get the Monday and Sunday dates for a given week."""
-    year, week = parse_week_key(week_key)
-    # Find the Monday of the given ISO week
-    jan4 = datetime(year, 1, 4)  # Jan 4 is always in week 1
-    start_of_week1 = jan4 - timedelta(days=jan4.weekday())
-    monday = start_of_week1 + timedelta(weeks=week - 1)
-    sunday = monday + timedelta(days=6)
-    return monday, sunday
-
-
-def format_week_display(week_key: str) -> str:
-    """Format week key for display."""
-    monday, sunday = get_week_dates(week_key)
-    return f"{monday.strftime('%b %d')} - {sunday.strftime('%b %d, %Y')}"
-
-
 # --- Authentication Functions ---
 def sign_up(email: str, password: str) -> tuple[bool, str]:
     """Sign up a new user."""
@@ -352,31 +333,39 @@ def get_session():
 
 
 # --- Database Functions ---
-def load_reflections(user_id: str) -> dict:
-    """Load all reflections for a user from Supabase."""
-    try:
-        response = supabase.table("reflections").select("*").eq("user_id", user_id).execute()
+def load_reflections(user_id: str, include_bodies: bool = True) -> dict:
+    """Load all reflections for a user from Supabase.
 
-        # Convert list to dict keyed by week_key
-        data = {}
-        if response.data:
-            for row in response.data:
-                data[row["week_key"]] = {
-                    "id": row["id"],
-                    "went_well": row.get("went_well", ""),
-                    "challenges": row.get("challenges", ""),
-                    "learned": row.get("learned", ""),
-                    "focus": row.get("focus", ""),
-                    "rating": row.get("rating", "3"),
-                    "created_at": row.get("created_at"),
-                    "updated_at": row.get("updated_at")
-                }
-        return data
+    With include_bodies=False only the rating and timestamps are loaded;
+    the reflection text is fetched per week via the prefetcher.
+    """
+    try:
+        columns = "*" if include_bodies else INDEX_COLUMNS
+        return query_reflections(supabase, user_id, columns)
     except Exception as e:
         st.error(f"Error loading reflections: {e}")
         return {}
 
 
+def fetch_reflection(user_id: str, week_key: str) -> dict:
+    """Fetch a single reflection from Supabase.
+
+    Runs on prefetch worker threads, so errors are raised rather than
+    shown with st.error.
+    """
+    response = (
+        supabase.table("reflections")
+        .select("*")
+        .eq("user_id", user_id)
+        .eq("week_key", week_key)
+        .limit(1)
+        .execute()
+    )
+    if response.data:
+        return row_to_entry(response.data[0])
+    return {}
+
+
 def save_reflection(user_id: str, week_key: str, entry: dict) -> tuple[bool, str]:
     """Save or update a reflection in Supabase."""
     try:
@@ -404,42 +393,61 @@ def save_reflection(user_id: str, week_key: str, entry: dict) -> tuple[bool, str
         return False, f"Error saving reflection: {e}"
 
 
-def calculate_stats(data: dict) -> dict:
-    """Calculate journal statistics."""
-    if not data:
-        return {"streak": 0, "avg_rating": 0, "total": 0}
+# --- Prefetching ---
+@st.cache_resource
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
 
-    # Total entries
-    total = len(data)
 
-    # Average rating
-    ratings = [int(entry.get("rating", 3)) for entry in data.values() if entry.get("rating")]
-    avg_rating = sum(ratings) / len(ratings) if ratings else 0
+def new_prefetcher() -> WeekPrefetcher:
+    """Create a prefetcher for this session; only the thread pool is shared."""
+    return WeekPrefetcher(fetch_reflection, get_prefetch_executor())
 
-    # Current streak (consecutive weeks from current week backwards)
-    current_week = get_week_key()
-    streak = 0
 
-    # Get all weeks sorted
-    weeks = sorted(data.keys(), reverse=True)
+def get_prefetcher() -> WeekPrefetcher:
+    """Get this session's prefetcher."""
+    if "prefetcher" not in st.session_state:
+        st.session_state.prefetcher = new_prefetcher()
+    return st.session_state.prefetcher
 
-    if weeks:
-        current_date = datetime.now()
 
-        for week_key in weeks:
-            expected_date = current_date - timedelta(weeks=streak)
-            expected_key = get_week_key(expected_date)
+def get_reflection(user_id: str, week_key: str) -> dict:
+    """Get a reflection with its text, loading it if only the index is in session state."""
+    entry = st.session_state.data.get(week_key, {})
+    if not entry or has_bodies(entry):
+        return entry
 
-            if week_key == expected_key:
-                streak += 1
-            else:
-                break
+    prefetcher = get_prefetcher()
+    full_entry = prefetcher.get(user_id, week_key)
+    if full_entry and full_entry.get("updated_at") != entry.get("updated_at"):
+        # Fetched before the row last changed, so load it again
+        prefetcher.invalidate(user_id, week_key)
+        full_entry = prefetcher.get(user_id, week_key)
+    if full_entry:
+        st.session_state.data[week_key] = full_entry
+    return full_entry
 
-    return {
-        "streak": streak,
-        "avg_rating": round(avg_rating, 1),
-        "total": total
-    }
+
+@st.cache_resource
+def get_feature_cache() -> FeatureCache:
+    return FeatureCache()
+
+
+def reset_trends():
+    """Let the trends toggle retry loading after a failure."""
+    st.session_state.trends_failed = False
+
+
+def prefetch_around(user_id: str, week_key: str, previous_week: str = None):
+    """Prefetch the neighbouring entries, further ahead in the browsing direction, and the current week."""
+    candidates = weeks_to_prefetch(sorted(st.session_state.data), week_key, previous_week) + [get_week_key()]
+    # Only weeks that exist and still lack their text need fetching
+    to_fetch = [
+        key for key in dict.fromkeys(candidates)
+        if key in st.session_state.data and not has_bodies(st.session_state.data[key])
+    ]
+    if to_fetch:
+        get_prefetcher().prefetch(user_id, to_fetch)
 
 
 # --- Initialize Session State ---
@@ -455,6 +463,15 @@ if "auth_mode" not in st.session_state:
 if "data" not in st.session_state:
     st.session_state.data = {}
 
+if "last_viewed_week" not in st.session_state:
+    st.session_state.last_viewed_week = None
+
+if "bodies_loaded" not in st.session_state:
+    st.session_state.bodies_loaded = False
+
+if "trends_failed" not in st.session_state:
+    st.session_state.trends_failed = False
+
 
 # --- Check Authentication ---
 user = get_current_user()
@@ -525,7 +542,11 @@ if not user:
 # Load user's reflections if not already loaded
 if "user_id" not in st.session_state or st.session_state.user_id != user.id:
     st.session_state.user_id = user.id
-    st.session_state.data = load_reflections(user.id)
+    st.session_state.data = load_reflections(user.id, include_bodies=False)
+    st.session_state.last_viewed_week = None
+    st.session_state.prefetcher = new_prefetcher()
+    st.session_state.bodies_loaded = False
+    st.session_state.trends_failed = False
 
 
 # --- Sidebar: History & Stats ---
@@ -550,6 +571,33 @@ with st.sidebar:
     with col3:
         st.metric("Total", stats['total'])
 
+    # Writing trends need every entry's text, so they are opt-in
+    if st.session_state.data and st.toggle("Show writing trends", key="show_trends", on_change=reset_trends):
+        if not st.session_state.bodies_loaded and not st.session_state.trends_failed:
+            full_data = load_reflections(user.id)
+            if full_data:
+                st.session_state.data.update(full_data)
+                st.session_state.bodies_loaded = True
+            else:
+                # load_reflections has shown the error; don't retry on every rerun
+                st.session_state.trends_failed = True
+
+        if st.session_state.trends_failed:
+            st.caption("Trends are unavailable right now. Toggle again to retry.")
+        else:
+            # Features are cached by content hash, so only new or edited entries are computed
+            features = get_feature_cache().features_for(st.session_state.data)
+            trends = build_trends(st.session_state.data, features)
+
+            if not trends.empty:
+                st.caption("Rating vs mood")
+                st.line_chart(trends[["rating", "mood_scaled", "rating_avg", "mood_avg"]], height=180)
+                st.caption("Words written")
+                st.line_chart(trends[["total_words", "words_avg"]], height=140)
+                themes = top_themes(features)
+                if themes:
+                    st.caption("Recurring themes: " + ", ".join(word for word, _ in themes))
+
     st.markdown("---")
     st.markdown("### Past Entries")
 
@@ -606,14 +654,22 @@ if is_current:
     st.info("This is the current week")
 
 # Load existing entry or create empty
-existing_entry = st.session_state.data.get(selected_week, {})
+try:
+    existing_entry = get_reflection(user.id, selected_week)
+except Exception as e:
+    st.error(f"Error loading reflection: {e}")
+    st.stop()
+
+# Warm the cache for likely next clicks, following the browsing direction
+prefetch_around(user.id, selected_week, st.session_state.last_viewed_week)
+st.session_state.last_viewed_week = selected_week
 
 st.markdown("")
 
 # --- Reflection Prompts ---
 
 # What went well
-st.markdown("#### What went well this week?")
+st.markdown(f"#### {PROMPTS['went_well']}")
 went_well = st.text_area(
     label="went_well",
     value=existing_entry.get("went_well", ""),
@@ -626,7 +682,7 @@ went_well = st.text_area(
 st.markdown("")
 
 # What didn't go as planned
-st.markdown("#### What didn't go as planned?")
+st.markdown(f"#### {PROMPTS['challenges']}")
 challenges = st.text_area(
     label="challenges",
     value=existing_entry.get("challenges", ""),
@@ -639,7 +695,7 @@ challenges = st.text_area(
 st.markdown("")
 
 # What did you learn
-st.markdown("#### What did you learn?")
+st.markdown(f"#### {PROMPTS['learned']}")
 learned = st.text_area(
     label="learned",
     value=existing_entry.get("learned", ""),
@@ -652,7 +708,7 @@ learned = st.text_area(
 st.markdown("")
 
 # Focus for next week
-st.markdown("#### What's one thing to focus on next week?")
+st.markdown(f"#### {PROMPTS['focus']}")
 focus = st.text_area(
     label="focus",
     value=existing_entry.get("focus", ""),
@@ -699,6 +755,7 @@ with col2:
         if success:
             # Update local cache
             st.session_state.data[selected_week] = entry
+            get_prefetcher().put(user.id, selected_week, entry)
             st.session_state.just_saved = True
             st.rerun()
         else:
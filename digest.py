@@ -0,0 +1,278 @@
+"""
+Batch Digest Generator
+Builds monthly or yearly "look back" digests from every user's reflections.
+
+Runs headless (no Streamlit). Users are paged from Supabase Auth and fanned
+out across a process pool; each digest is written to disk as soon as it is
+ready and recorded in a progress log, so an interrupted run can simply be
+started again and picks up where it left off.
+
+Usage:
+    python digest.py --month 2026-09
+    python digest.py --year 2026 --format html --workers 8
+"""
+
+import argparse
+import html
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+from journal import (
+    INDEX_COLUMNS,
+    PROMPTS,
+    RATING_LABELS,
+    calculate_stats,
+    format_week_display,
+    get_week_dates,
+    get_week_key,
+    query_reflections,
+)
+
+# --- Configuration ---
+USERS_PER_PAGE = 200
+# Jobs are mostly waiting on the network, so run several per CPU
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# Submitted-but-unfinished digests per worker, to bound memory on huge runs
+IN_FLIGHT_PER_WORKER = 4
+PROGRESS_FILE = "_done.txt"
+
+
+# --- Periods ---
+def parse_period(month: str = None, year: str = None) -> tuple:
+    """Get (label, start, end) for a month ('2026-09') or year ('2026').
+
+    Defaults to the previous calendar month. end is exclusive.
+    """
+    if year:
+        start = datetime(int(year), 1, 1)
+        return year, start, datetime(start.year + 1, 1, 1)
+
+    if month:
+        start = datetime.strptime(month, "%Y-%m")
+    else:
+        first_of_this_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        start = (first_of_this_month - timedelta(days=1)).replace(day=1)
+    end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start.strftime("%Y-%m"), start, end
+
+
+def week_in_period(week_key: str, start: datetime, end: datetime) -> bool:
+    """Check whether a week belongs to a period.
+
+    Like ISO years, a week belongs to the period containing its Thursday,
+    so every week lands in exactly one month.
+    """
+    monday, _ = get_week_dates(week_key)
+    return start <= monday + timedelta(days=3) < end
+
+
+def period_week_range(start: datetime, end: datetime) -> tuple:
+    """Get (first week, first week after) for a period, matching week_in_period.
+
+    The week containing a date 3 days on has its Thursday on or after that date.
+    """
+    return get_week_key(start + timedelta(days=3)), get_week_key(end + timedelta(days=3))
+
+
+# --- Rendering ---
+def render_markdown(email: str, label: str, data: dict, stats: dict) -> str:
+    """Render a digest as Markdown."""
+    lines = [
+        f"# Your look back: {label}",
+        "",
+        f"*{email}*",
+        "",
+        f"- **Reflections:** {stats['total']}",
+        f"- **Average rating:** {stats['avg_rating'] or '-'}",
+        f"- **Streak at period end:** {stats['streak']}w",
+        "",
+    ]
+
+    for week_key in sorted(data.keys()):
+        entry = data[week_key]
+        rating = entry.get("rating") or "3"
+        lines += [f"## {format_week_display(week_key)} - {RATING_LABELS.get(rating, rating)}", ""]
+        for field, title in PROMPTS.items():
+            text = entry.get(field, "").strip()
+            if text:
+                lines += [f"**{title}**", "", text, ""]
+
+    return "\n".join(lines)
+
+
+def render_html(email: str, label: str, data: dict, stats: dict) -> str:
+    """Render a digest as a standalone HTML page."""
+    parts = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset='utf-8'>",
+        f"<title>Your look back: {html.escape(label)}</title>",
+        "<style>",
+        "body { font-family: sans-serif; max-width: 640px; margin: 40px auto; color: #4a5568; background: #f5f7fa; }",
+        "h1 { font-weight: 300; } h2 { font-weight: 400; color: #5a6878; }",
+        ".week { background: white; border-radius: 16px; padding: 24px; margin: 16px 0; }",
+        "</style></head><body>",
+        f"<h1>Your look back: {html.escape(label)}</h1>",
+        f"<p><em>{html.escape(email)}</em></p>",
+        "<ul>",
+        f"<li><strong>Reflections:</strong> {stats['total']}</li>",
+        f"<li><strong>Average rating:</strong> {stats['avg_rating'] or '-'}</li>",
+        f"<li><strong>Streak at period end:</strong> {stats['streak']}w</li>",
+        "</ul>",
+    ]
+
+    for week_key in sorted(data.keys()):
+        entry = data[week_key]
+        rating = entry.get("rating") or "3"
+        parts.append("<div class='week'>")
+        parts.append(f"<h2>{html.escape(format_week_display(week_key))} - {html.escape(RATING_LABELS.get(rating, rating))}</h2>")
+        for field, title in PROMPTS.items():
+            text = entry.get(field, "").strip()
+            if text:
+                body = html.escape(text).replace("\n", "<br>")
+                parts.append(f"<p><strong>{title}</strong><br>{body}</p>")
+        parts.append("</div>")
+
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+RENDERERS = {"md": render_markdown, "html": render_html}
+
+
+# --- Workers ---
+_client = None
+
+
+def init_worker(url: str, key: str):
+    """Create one Supabase client per worker process."""
+    global _client
+    _client = create_client(url, key)
+
+
+def build_digest(user_id: str, email: str, label: str, start: datetime, end: datetime,
+                 fmt: str, out_dir: str) -> tuple[str, str]:
+    """Build and write one user's digest. Returns (user_id, status)."""
+    from_week, to_week = period_week_range(start, end)
+    # Text is only needed for the period itself
+    data = query_reflections(_client, user_id, "*", from_week, to_week)
+    if not data:
+        return user_id, "empty"
+
+    stats = calculate_stats(data)
+    # The streak can run back past the period start, so count it over the
+    # history up to the period end, without the text. The week containing
+    # end - 4 days is the last one whose Thursday is in the period.
+    history = query_reflections(_client, user_id, INDEX_COLUMNS, to_week=to_week)
+    stats["streak"] = calculate_stats(history, as_of=end - timedelta(days=4))["streak"]
+    content = RENDERERS[fmt](email or "", label, data, stats)
+
+    # Write atomically so an interrupted run never leaves a partial digest
+    path = os.path.join(out_dir, f"{user_id}.{fmt}")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return user_id, "written"
+
+
+# --- Driver ---
+def iter_users(client: Client, per_page: int = USERS_PER_PAGE):
+    """Yield (user_id, email) for every user, one page at a time."""
+    page = 1
+    while True:
+        users = client.auth.admin.list_users(page=page, per_page=per_page)
+        for user in users:
+            yield user.id, user.email
+        if len(users) < per_page:
+            break
+        page += 1
+
+
+def load_progress(path: str) -> set:
+    """Get the user ids already finished by a previous run."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.split("\t", 1)[0] for line in f if line.strip()}
+
+
+def run(label: str, start: datetime, end: datetime, fmt: str, out_root: str, workers: int) -> dict:
+    """Generate digests for all users, skipping those already done."""
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        sys.exit("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY. Listing users needs the service role key.")
+
+    out_dir = os.path.join(out_root, label, fmt)
+    os.makedirs(out_dir, exist_ok=True)
+    progress_path = os.path.join(out_dir, PROGRESS_FILE)
+    done = load_progress(progress_path)
+    counts = {"written": 0, "empty": 0, "skipped": 0, "failed": 0}
+
+    client = create_client(url, key)
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(url, key)) as pool, \
+            open(progress_path, "a", encoding="utf-8") as progress:
+        pending = {}
+
+        def collect(futures):
+            for future in futures:
+                user_id = pending.pop(future)
+                try:
+                    _, status = future.result()
+                except Exception as e:
+                    # Not recorded as done, so the next run retries this user
+                    counts["failed"] += 1
+                    print(f"Failed {user_id}: {e}", file=sys.stderr)
+                    continue
+                counts[status] += 1
+                progress.write(f"{user_id}\t{status}\n")
+                progress.flush()
+
+        for user_id, email in iter_users(client):
+            if user_id in done:
+                counts["skipped"] += 1
+                continue
+            if len(pending) >= max_in_flight:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+            future = pool.submit(build_digest, user_id, email, label, start, end, fmt, out_dir)
+            pending[future] = user_id
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate look-back digests for every user.")
+    when = parser.add_mutually_exclusive_group()
+    when.add_argument("--month", help="Month to digest, e.g. 2026-09 (default: last month)")
+    when.add_argument("--year", help="Year to digest, e.g. 2026")
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="md", help="Output format")
+    parser.add_argument("--out", default="digests", help="Output directory")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Worker processes; jobs are network-bound, so more than the CPU count helps (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    load_dotenv()
+    label, start, end = parse_period(args.month, args.year)
+    counts = run(label, start, end, args.format, args.out, args.workers)
+    print(
+        f"Digests for {label}: {counts['written']} written, {counts['empty']} empty, "
+        f"{counts['skipped']} already done, {counts['failed']} failed"
+    )
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
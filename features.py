@@ -0,0 +1,158 @@
+"""
+Writing features for trend analytics.
+Word counts, recurring themes and a lexicon-based mood score per entry,
+cached by content hash so only edited entries are recomputed.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+import pandas as pd
+
+from journal import BODY_FIELDS, get_week_dates, get_week_key, has_bodies
+
+# --- Configuration ---
+# Words, numbers and contractions ("5k", "didn't") each count as one word
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+STOPWORDS = {
+    "the", "and", "was", "for", "that", "with", "this", "have", "had", "but", "not",
+    "are", "you", "all", "can", "has", "were", "been", "from", "they", "will", "would",
+    "there", "their", "what", "about", "which", "when", "more", "some", "into", "than",
+    "then", "them", "out", "just", "also", "very", "too", "get", "got", "did", "didn't",
+    "don't", "its", "it's", "i'm", "i've", "one", "week", "next", "really", "much", "lot",
+    "our", "how", "want", "need", "make", "made", "still", "even", "being", "day", "days",
+}
+POSITIVE_WORDS = {
+    "good", "great", "happy", "calm", "proud", "progress", "win", "won", "enjoyed",
+    "fun", "love", "loved", "grateful", "excited", "productive", "rested", "better",
+    "success", "successful", "finished", "accomplished", "relaxed", "energized", "peaceful",
+}
+NEGATIVE_WORDS = {
+    "bad", "tired", "stressed", "stress", "anxious", "sad", "angry", "frustrated",
+    "frustrating", "failed", "fail", "worse", "sick", "overwhelmed", "exhausted", "lonely",
+    "worried", "behind", "struggled", "hard", "difficult", "burnout", "upset", "procrastinated",
+}
+# Weeks averaged for smoothed trend lines
+TREND_WINDOW = 4
+# Entry versions kept in the shared feature cache
+FEATURE_CACHE_SIZE = 50000
+
+
+def content_hash(entry: dict) -> str:
+    """Hash the reflection text of an entry."""
+    text = "\x1f".join(entry.get(field, "") for field in BODY_FIELDS)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def tokenize(text: str) -> list:
+    """Split text into lowercase words, treating curly apostrophes as straight ones."""
+    return WORD_PATTERN.findall(text.lower().replace("\u2019", "'"))
+
+
+def is_keyword(word: str) -> bool:
+    """Check whether a word is worth tracking as a theme."""
+    return len(word) > 2 and word.replace("'", "").isalpha() and word not in STOPWORDS
+
+
+def extract_features(entry: dict) -> dict:
+    """Compute word counts, keywords and mood score for one entry.
+
+    Mood is (positive - negative) / (positive + negative) over the lexicon
+    words found, from -1 to 1, or NaN when none are found so that weeks
+    without any signal are left out of mood trends.
+    """
+    features = {}
+    keywords = Counter()
+    positive = negative = 0
+
+    for field in BODY_FIELDS:
+        words = tokenize(entry.get(field, ""))
+        features[f"{field}_words"] = len(words)
+        keywords.update(w for w in words if is_keyword(w))
+        positive += sum(1 for w in words if w in POSITIVE_WORDS)
+        negative += sum(1 for w in words if w in NEGATIVE_WORDS)
+
+    features["mood"] = (positive - negative) / (positive + negative) if positive + negative else math.nan
+    features["keywords"] = keywords
+    return features
+
+
+class FeatureCache:
+    """Entry features keyed by content hash, so each entry version is computed once.
+
+    Thread-safe, so a single instance can be shared by all sessions.
+    """
+
+    def __init__(self, max_size: int = FEATURE_CACHE_SIZE):
+        self.max_size = max_size
+        self.cache = OrderedDict()  # content hash -> features
+        self.lock = threading.Lock()
+
+    def get(self, entry: dict) -> dict:
+        """Get the features for an entry, computing them if its text is new."""
+        digest = content_hash(entry)
+        with self.lock:
+            features = self.cache.get(digest)
+            if features is not None:
+                self.cache.move_to_end(digest)
+                return features
+
+        features = extract_features(entry)
+        with self.lock:
+            self.cache[digest] = features
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+        return features
+
+    def features_for(self, data: dict) -> dict:
+        """Get features by week for every entry with its text loaded."""
+        return {week_key: self.get(entry) for week_key, entry in data.items() if has_bodies(entry)}
+
+
+def calendar_weeks(first: str, last: str) -> list:
+    """Get every week key from first to last, inclusive."""
+    monday, _ = get_week_dates(first)
+    weeks = [first]
+    while weeks[-1] < last:
+        monday += timedelta(weeks=1)
+        weeks.append(get_week_key(monday))
+    return weeks
+
+
+def build_trends(data: dict, features: dict) -> pd.DataFrame:
+    """Build a per-week frame of rating, word counts and mood with rolling averages."""
+    if not features:
+        return pd.DataFrame()
+
+    counts = {
+        week_key: {name: value for name, value in entry_features.items() if name != "keywords"}
+        for week_key, entry_features in features.items()
+    }
+    df = pd.DataFrame.from_dict(counts, orient="index").sort_index()
+    word_columns = [f"{field}_words" for field in BODY_FIELDS]
+    df["total_words"] = df[word_columns].sum(axis=1)
+    df["rating"] = pd.to_numeric(
+        pd.Series({week_key: data[week_key].get("rating") for week_key in df.index}),
+        errors="coerce"
+    )
+    # Put mood on the 1-5 rating scale so the two can share a chart
+    df["mood_scaled"] = 3 + 2 * df["mood"]
+
+    # Roll over calendar weeks, so skipped weeks shorten the window instead of
+    # pulling in entries from further back
+    weekly = df[["rating", "mood_scaled", "total_words"]].reindex(calendar_weeks(df.index[0], df.index[-1]))
+    rolling = weekly.rolling(TREND_WINDOW, min_periods=1).mean().loc[df.index]
+    df[["rating_avg", "mood_avg", "words_avg"]] = rolling.to_numpy()
+    return df
+
+
+def top_themes(features: dict, n: int = 8) -> list:
+    """Get the keywords that recur across the most weeks as (word, weeks) pairs."""
+    totals = Counter()
+    for entry_features in features.values():
+        totals.update(entry_features["keywords"].keys())
+    return totals.most_common(n)
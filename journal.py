@@ -0,0 +1,139 @@
+"""
+Journal helpers shared by the Streamlit app and headless scripts.
+Nothing in here depends on Streamlit.
+"""
+
+from datetime import datetime, timedelta
+
+RATING_LABELS = {
+    "1": "Rough",
+    "2": "Meh",
+    "3": "Okay",
+    "4": "Good",
+    "5": "Great"
+}
+# Reflection prompts by field, in display order
+PROMPTS = {
+    "went_well": "What went well this week?",
+    "challenges": "What didn't go as planned?",
+    "learned": "What did you learn?",
+    "focus": "What's one thing to focus on next week?",
+}
+# Reflection text fields, loaded lazily per week
+BODY_FIELDS = list(PROMPTS)
+# Lightweight columns loaded up front for the sidebar and stats
+INDEX_COLUMNS = "id, week_key, rating, created_at, updated_at"
+
+
+# --- Week Helpers ---
+def get_week_key(date: datetime = None) -> str:
+    """Get ISO week key (e.g., '2026-W03')."""
+    if date is None:
+        date = datetime.now()
+    return f"{date.isocalendar()[0]}-W{date.isocalendar()[1]:02d}"
+
+
+def parse_week_key(week_key: str) -> tuple:
+    """Parse week key to (year, week_number)."""
+    parts = week_key.split("-W")
+    return int(parts[0]), int(parts[1])
+
+
+def get_week_dates(week_key: str) -> tuple:
+    """Get the Monday and Sunday dates for a given week."""
+    year, week = parse_week_key(week_key)
+    # Find the Monday of the given ISO week
+    jan4 = datetime(year, 1, 4)  # Jan 4 is always in week 1
+    start_of_week1 = jan4 - timedelta(days=jan4.weekday())
+    monday = start_of_week1 + timedelta(weeks=week - 1)
+    sunday = monday + timedelta(days=6)
+    return monday, sunday
+
+
+def format_week_display(week_key: str) -> str:
+    """Format week key for display."""
+    monday, sunday = get_week_dates(week_key)
+    return f"{monday.strftime('%b %d')} - {sunday.strftime('%b %d, %Y')}"
+
+
+def has_bodies(entry: dict) -> bool:
+    """Check whether an entry has its reflection text loaded."""
+    return all(field in entry for field in BODY_FIELDS)
+
+
+# --- Database Helpers ---
+def row_to_entry(row: dict) -> dict:
+    """Convert a reflections row to a journal entry."""
+    entry = {
+        "id": row["id"],
+        "rating": row.get("rating", "3"),
+        "created_at": row.get("created_at"),
+        "updated_at": row.get("updated_at")
+    }
+    for field in BODY_FIELDS:
+        if field in row:
+            entry[field] = row.get(field) or ""
+    return entry
+
+
+def query_reflections(client, user_id: str, columns: str = "*",
+                      from_week: str = None, to_week: str = None) -> dict:
+    """Query reflections for a user, keyed by week_key.
+
+    from_week (inclusive) and to_week (exclusive) limit the weeks returned;
+    week keys are zero-padded, so they compare correctly as text.
+    Errors are raised; callers decide how to report them.
+    """
+    query = client.table("reflections").select(columns).eq("user_id", user_id)
+    if from_week:
+        query = query.gte("week_key", from_week)
+    if to_week:
+        query = query.lt("week_key", to_week)
+    response = query.execute()
+
+    # Convert list to dict keyed by week_key
+    data = {}
+    if response.data:
+        for row in response.data:
+            data[row["week_key"]] = row_to_entry(row)
+    return data
+
+
+# --- Stats ---
+def calculate_stats(data: dict, as_of: datetime = None) -> dict:
+    """Calculate journal statistics.
+
+    The streak counts back from the week containing as_of (default: now).
+    """
+    if not data:
+        return {"streak": 0, "avg_rating": 0, "total": 0}
+
+    # Total entries
+    total = len(data)
+
+    # Average rating
+    ratings = [int(entry.get("rating", 3)) for entry in data.values() if entry.get("rating")]
+    avg_rating = sum(ratings) / len(ratings) if ratings else 0
+
+    # Current streak (consecutive weeks from current week backwards)
+    current_date = as_of or datetime.now()
+    current_week = get_week_key(current_date)
+    streak = 0
+
+    # Get all weeks up to the current one, sorted
+    weeks = sorted((key for key in data.keys() if key <= current_week), reverse=True)
+
+    for week_key in weeks:
+        expected_date = current_date - timedelta(weeks=streak)
+        expected_key = get_week_key(expected_date)
+
+        if week_key == expected_key:
+            streak += 1
+        else:
+            break
+
+    return {
+        "streak": streak,
+        "avg_rating": round(avg_rating, 1),
+        "total": total
+    }
@@ -0,0 +1,111 @@
+"""
+Background prefetching of journal entries.
+Nothing in here depends on Streamlit.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+# --- Configuration ---
+PREFETCH_CACHE_SIZE = 64
+# Seconds to wait on a background fetch that is already running
+FETCH_TIMEOUT = 10
+# Extra entries fetched in the direction the user is browsing
+PREFETCH_AHEAD = 3
+
+
+def _failed(future: Future) -> bool:
+    return future.done() and (future.cancelled() or future.exception() is not None)
+
+
+class WeekPrefetcher:
+    """Loads reflections in the background into a bounded LRU cache.
+
+    fetch(user_id, week_key) loads one entry. Background fetches run on the
+    executor; a week that is asked for and not already loading is fetched on
+    the caller's thread so it never queues behind speculative work.
+    """
+
+    def __init__(self, fetch, executor: ThreadPoolExecutor, max_size: int = PREFETCH_CACHE_SIZE,
+                 timeout: float = FETCH_TIMEOUT):
+        self.fetch = fetch
+        self.executor = executor
+        self.max_size = max_size
+        self.timeout = timeout
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _store(self, key: tuple, future: Future):
+        self.cache[key] = future
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def prefetch(self, user_id: str, week_keys: list):
+        """Start loading any weeks that are not already cached or in flight.
+
+        Weeks whose last fetch failed are retried.
+        """
+        with self.lock:
+            for week_key in week_keys:
+                key = (user_id, week_key)
+                future = self.cache.get(key)
+                if future is None or _failed(future):
+                    future = self.executor.submit(self.fetch, user_id, week_key)
+                self._store(key, future)
+
+    def get(self, user_id: str, week_key: str) -> dict:
+        """Get a reflection, using a cached or running fetch, or loading it now."""
+        key = (user_id, week_key)
+        with self.lock:
+            future = self.cache.get(key)
+            # A fetch still waiting in the queue is dropped and done here instead
+            if future is not None and (_failed(future) or future.cancel()):
+                future = None
+            if future is not None:
+                self.cache.move_to_end(key)
+
+        if future is not None:
+            try:
+                return future.result(timeout=self.timeout)
+            except TimeoutError:
+                raise TimeoutError(f"Timed out loading {week_key}") from None
+
+        entry = self.fetch(user_id, week_key)
+        self.put(user_id, week_key, entry)
+        return entry
+
+    def put(self, user_id: str, week_key: str, entry: dict):
+        """Replace a cached reflection, e.g. after saving it."""
+        future = Future()
+        future.set_result(entry)
+        with self.lock:
+            self._store((user_id, week_key), future)
+
+    def invalidate(self, user_id: str, week_key: str):
+        """Drop a cached reflection so the next get refetches it."""
+        with self.lock:
+            self.cache.pop((user_id, week_key), None)
+
+
+def weeks_to_prefetch(week_keys: list, week_key: str, previous_week: str = None,
+                      ahead: int = PREFETCH_AHEAD) -> list:
+    """Get the entries to prefetch around week_key in the sorted list week_keys.
+
+    Always includes the entries on either side, plus `ahead` more in the
+    direction the user moved from previous_week.
+    """
+    if week_key not in week_keys:
+        return []
+    i = week_keys.index(week_key)
+    before = week_keys[max(i - 1, 0):i]
+    after = week_keys[i + 1:i + 2]
+
+    if previous_week and previous_week > week_key:
+        before = week_keys[max(i - 1 - ahead, 0):i]
+    elif previous_week and previous_week < week_key:
+        after = week_keys[i + 1:i + 2 + ahead]
+
+    # Nearest first, so they are fetched before the ones further away
+    return after[:1] + before[::-1][:1] + after[1:] + before[::-1][1:]
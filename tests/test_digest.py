@@ -0,0 +1,109 @@
+from datetime import datetime
+
+import pytest
+
+import digest
+from digest import build_digest, parse_period, period_week_range, render_markdown, week_in_period
+from journal import BODY_FIELDS
+
+
+def test_parse_december_rolls_into_next_year():
+    assert parse_period("2026-12") == ("2026-12", datetime(2026, 12, 1), datetime(2027, 1, 1))
+
+
+def test_parse_year():
+    assert parse_period(year="2026") == ("2026", datetime(2026, 1, 1), datetime(2027, 1, 1))
+
+
+def test_parse_default_is_a_full_month():
+    label, start, end = parse_period()
+    assert start.day == 1 and end.day == 1
+    assert start < end <= datetime.now()
+
+
+@pytest.mark.parametrize("week_key, month", [
+    ("2026-W53", "2026-12"),  # Thursday Dec 31
+    ("2027-W01", "2027-01"),  # Thursday Jan 7
+    ("2025-W01", "2025-01"),  # Monday Dec 30, Thursday Jan 2
+    ("2026-W40", "2026-10"),  # Monday Sep 28, Thursday Oct 1
+])
+def test_week_belongs_to_month_of_its_thursday(week_key, month):
+    _, start, end = parse_period(month)
+    assert week_in_period(week_key, start, end)
+
+
+def test_every_week_in_exactly_one_month():
+    weeks = [f"2026-W{n:02d}" for n in range(1, 54)]
+    months = [parse_period(f"2026-{m:02d}") for m in range(1, 13)]
+    for week_key in weeks:
+        assert sum(week_in_period(week_key, start, end) for _, start, end in months) == 1
+
+
+def test_year_matches_iso_year():
+    _, start, end = parse_period(year="2026")
+    assert week_in_period("2026-W01", start, end)
+    assert week_in_period("2026-W53", start, end)
+    assert not week_in_period("2025-W52", start, end)
+    assert not week_in_period("2027-W01", start, end)
+
+
+def test_markdown_skips_empty_prompts():
+    data = {"2026-W40": {"rating": "4", "went_well": "Shipped it", "challenges": "", "learned": "", "focus": ""}}
+    stats = {"total": 1, "avg_rating": 4.0, "streak": 6}
+    content = render_markdown("me@example.com", "2026-10", data, stats)
+    assert "Good" in content
+    assert "Shipped it" in content
+    assert "didn't go as planned" not in content
+    assert "6w" in content
+
+
+def fake_query(history, calls):
+    """Stand-in for query_reflections that honours the columns and week range."""
+    def query(client, user_id, columns="*", from_week=None, to_week=None):
+        calls.append((columns, from_week, to_week))
+        rows = {
+            key: entry for key, entry in history.items()
+            if (not from_week or key >= from_week) and (not to_week or key < to_week)
+        }
+        if columns != "*":
+            rows = {key: {k: v for k, v in entry.items() if k not in BODY_FIELDS} for key, entry in rows.items()}
+        return rows
+    return query
+
+
+@pytest.mark.parametrize("period", [f"2026-{m:02d}" for m in range(1, 13)] + ["2027-01"])
+def test_week_range_matches_week_in_period(period):
+    _, start, end = parse_period(period)
+    from_week, to_week = period_week_range(start, end)
+    weeks = [f"{y}-W{n:02d}" for y in (2025, 2026, 2027) for n in range(1, 53)] + ["2026-W53"]
+    for week_key in weeks:
+        assert (from_week <= week_key < to_week) == week_in_period(week_key, start, end)
+
+
+def test_year_week_range():
+    _, start, end = parse_period(year="2026")
+    assert period_week_range(start, end) == ("2026-W01", "2027-W01")
+
+
+def test_streak_counts_weeks_before_the_period(monkeypatch, tmp_path):
+    history = {f"2026-W{n:02d}": {"rating": "4", "went_well": "ok"} for n in range(20, 45)}
+    calls = []
+    monkeypatch.setattr(digest, "query_reflections", fake_query(history, calls))
+    label, start, end = parse_period("2026-09")
+
+    assert build_digest("u1", "me@example.com", label, start, end, "md", str(tmp_path)) == ("u1", "written")
+    content = (tmp_path / "u1.md").read_text()
+    assert "**Reflections:** 4" in content
+    assert "**Streak at period end:** 20w" in content
+    # Text only for the period; the full history without it
+    assert calls == [("*", "2026-W36", "2026-W40"), (digest.INDEX_COLUMNS, None, "2026-W40")]
+
+
+def test_no_entries_in_period_is_empty(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(digest, "query_reflections", fake_query({"2026-W30": {"rating": "3"}}, calls))
+    label, start, end = parse_period("2026-09")
+
+    assert build_digest("u1", "", label, start, end, "md", str(tmp_path)) == ("u1", "empty")
+    assert not list(tmp_path.iterdir())
+    assert len(calls) == 1
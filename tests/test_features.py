@@ -0,0 +1,103 @@
+import math
+
+import features
+from features import FeatureCache, build_trends, extract_features, top_themes
+
+EMPTY = {"went_well": "", "challenges": "", "learned": "", "focus": ""}
+
+
+def entry(**text):
+    return {"rating": "3", **EMPTY, **text}
+
+
+def test_word_counts_and_mood():
+    result = extract_features(entry(went_well="Great productive week", challenges="tired"))
+    assert result["went_well_words"] == 3
+    assert result["challenges_words"] == 1
+    assert result["mood"] == 1 / 3
+    assert result["keywords"]["productive"] == 1
+    assert "week" not in result["keywords"]
+
+
+def test_no_lexicon_words_has_no_mood():
+    assert math.isnan(extract_features(entry())["mood"])
+    assert math.isnan(extract_features(entry(learned="planning ahead"))["mood"])
+
+
+def test_cache_computes_each_version_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(features, "extract_features", lambda e: calls.append(e) or {"mood": 0.0})
+    cache = FeatureCache()
+    data = {"2026-W40": entry(went_well="good"), "2026-W41": entry(went_well="good")}
+
+    cache.features_for(data)
+    cache.features_for(dict(data))
+    assert len(calls) == 1  # same text, same hash
+
+    data["2026-W41"] = entry(went_well="better")
+    cache.features_for(data)
+    assert len(calls) == 2
+
+
+def test_cache_skips_entries_without_text():
+    data = {"2026-W40": {"rating": "4"}, "2026-W41": entry(focus="rest")}
+    assert list(FeatureCache().features_for(data)) == ["2026-W41"]
+
+
+def test_cache_is_bounded():
+    cache = FeatureCache(max_size=2)
+    for text in ["a1", "b2", "c3"]:
+        cache.get(entry(went_well=text))
+    assert len(cache.cache) == 2
+
+
+def test_trends_with_empty_entry():
+    data = {
+        "2026-W40": {**entry(went_well="happy and proud"), "rating": "5"},
+        "2026-W41": {**entry(), "rating": "2"},
+    }
+    trends = build_trends(data, FeatureCache().features_for(data))
+
+    assert list(trends.index) == ["2026-W40", "2026-W41"]
+    assert list(trends["total_words"]) == [3, 0]
+    assert list(trends["rating_avg"]) == [5.0, 3.5]
+    # The empty week has no mood and does not pull the average towards neutral
+    assert math.isnan(trends.loc["2026-W41", "mood_scaled"])
+    assert trends.loc["2026-W41", "mood_avg"] == 5.0
+
+
+def test_trends_empty():
+    assert build_trends({}, {}).empty
+
+
+def test_themes_count_weeks():
+    data = {
+        "2026-W40": entry(went_well="project project project"),
+        "2026-W41": entry(learned="project planning"),
+    }
+    assert top_themes(FeatureCache().features_for(data), n=2) == [("project", 2), ("planning", 1)]
+
+
+def test_word_counts_include_short_words_numbers_and_contractions():
+    result = extract_features(entry(went_well="I ran a 5k and felt great", challenges="Didn’t sleep; I was not happy"))
+    assert result["went_well_words"] == 7
+    assert result["challenges_words"] == 6
+    assert "didn" not in result["keywords"]
+    assert "5k" not in result["keywords"]
+    assert result["keywords"]["sleep"] == 1
+
+
+def test_rolling_window_covers_calendar_weeks():
+    data = {
+        "2026-W01": {**entry(went_well="good"), "rating": "1"},
+        "2026-W02": {**entry(went_well="good"), "rating": "3"},
+        "2026-W10": {**entry(went_well="good"), "rating": "5"},
+    }
+    trends = build_trends(data, FeatureCache().features_for(data))
+
+    assert list(trends.index) == ["2026-W01", "2026-W02", "2026-W10"]
+    assert list(trends["rating_avg"]) == [1.0, 2.0, 5.0]
+
+
+def test_calendar_weeks_across_53_week_year():
+    assert features.calendar_weeks("2026-W52", "2027-W02") == ["2026-W52", "2026-W53", "2027-W01", "2027-W02"]
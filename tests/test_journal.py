@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from journal import calculate_stats, get_week_key
+
+
+def test_week_key_uses_iso_year():
+    assert get_week_key(datetime(2027, 1, 1)) == "2026-W53"
+    assert get_week_key(datetime(2025, 12, 29)) == "2026-W01"
+
+
+def test_stats_empty():
+    assert calculate_stats({}) == {"streak": 0, "avg_rating": 0, "total": 0}
+
+
+def test_streak_ignores_future_weeks():
+    data = {week: {"rating": "4"} for week in ["2026-W40", "2026-W41", "2026-W42", "2026-W45"]}
+    stats = calculate_stats(data, as_of=datetime(2026, 10, 15))  # in 2026-W42
+    assert stats["streak"] == 3
+    assert stats["total"] == 4
+
+
+def test_streak_across_year_boundary():
+    data = {week: {"rating": "2"} for week in ["2026-W52", "2026-W53", "2027-W01"]}
+    stats = calculate_stats(data, as_of=datetime(2027, 1, 6))
+    assert stats["streak"] == 3
+    assert stats["avg_rating"] == 2.0
+
+
+def test_streak_broken_by_gap():
+    data = {week: {"rating": "5"} for week in ["2026-W38", "2026-W40"]}
+    assert calculate_stats(data, as_of=datetime(2026, 10, 1))["streak"] == 1
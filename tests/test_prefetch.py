@@ -0,0 +1,160 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from prefetch import WeekPrefetcher, weeks_to_prefetch
+
+
+class FakeFetch:
+    """Records calls; fetches for weeks in `blocked` wait until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.failures = {}
+        self.blocked = set()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, user_id, week_key):
+        self.calls.append((week_key, threading.current_thread().name))
+        if week_key in self.blocked:
+            self.started.set()
+            self.release.wait(5)
+        if self.failures.get(week_key):
+            self.failures[week_key] -= 1
+            raise ConnectionError("network blip")
+        return {"week": week_key, "calls": len(self.calls)}
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as pool:
+        yield pool
+
+
+def test_in_flight_future_is_reused(executor):
+    fetch = FakeFetch()
+    fetch.blocked.add("2026-W40")
+    prefetcher = WeekPrefetcher(fetch, executor)
+
+    prefetcher.prefetch("u", ["2026-W40"])
+    fetch.started.wait(5)
+    prefetcher.prefetch("u", ["2026-W40"])
+    fetch.release.set()
+
+    assert prefetcher.get("u", "2026-W40")["week"] == "2026-W40"
+    assert len(fetch.calls) == 1
+
+
+def test_failed_prefetch_is_resubmitted(executor):
+    fetch = FakeFetch()
+    fetch.failures["2026-W40"] = 1
+    prefetcher = WeekPrefetcher(fetch, executor)
+
+    prefetcher.prefetch("u", ["2026-W40"])
+    executor.submit(lambda: None).result()  # wait for the failed fetch
+    prefetcher.prefetch("u", ["2026-W40"])
+
+    assert prefetcher.get("u", "2026-W40")["week"] == "2026-W40"
+    assert len(fetch.calls) == 2
+
+
+def test_failed_prefetch_is_retried_on_get(executor):
+    fetch = FakeFetch()
+    fetch.failures["2026-W40"] = 1
+    prefetcher = WeekPrefetcher(fetch, executor)
+
+    prefetcher.prefetch("u", ["2026-W40"])
+    executor.submit(lambda: None).result()
+
+    assert prefetcher.get("u", "2026-W40")["week"] == "2026-W40"
+
+
+def test_get_does_not_queue_behind_prefetches(executor):
+    fetch = FakeFetch()
+    fetch.blocked.add("2026-W01")
+    prefetcher = WeekPrefetcher(fetch, executor)
+
+    prefetcher.prefetch("u", ["2026-W01", "2026-W02"])
+    fetch.started.wait(5)
+    # 2026-W02 is still queued behind the blocked fetch, so it is loaded here instead
+    assert prefetcher.get("u", "2026-W02")["week"] == "2026-W02"
+    assert fetch.calls[-1] == ("2026-W02", threading.current_thread().name)
+    assert prefetcher.get("u", "2026-W03")["week"] == "2026-W03"
+    fetch.release.set()
+
+
+def test_get_times_out_on_hung_fetch(executor):
+    fetch = FakeFetch()
+    fetch.blocked.add("2026-W40")
+    prefetcher = WeekPrefetcher(fetch, executor, timeout=0.05)
+
+    prefetcher.prefetch("u", ["2026-W40"])
+    fetch.started.wait(5)
+    with pytest.raises(TimeoutError, match="2026-W40"):
+        prefetcher.get("u", "2026-W40")
+    fetch.release.set()
+
+
+def test_cache_is_bounded(executor):
+    prefetcher = WeekPrefetcher(FakeFetch(), executor, max_size=2)
+    prefetcher.prefetch("u", ["2026-W01", "2026-W02"])
+    prefetcher.get("u", "2026-W01")  # most recently used
+    prefetcher.prefetch("u", ["2026-W03"])
+
+    assert list(prefetcher.cache) == [("u", "2026-W01"), ("u", "2026-W03")]
+
+
+def test_put_overrides_in_flight_fetch(executor):
+    fetch = FakeFetch()
+    fetch.blocked.add("2026-W40")
+    prefetcher = WeekPrefetcher(fetch, executor)
+
+    prefetcher.prefetch("u", ["2026-W40"])
+    fetch.started.wait(5)
+    prefetcher.put("u", "2026-W40", {"week": "saved"})
+    fetch.release.set()
+    executor.submit(lambda: None).result()
+
+    assert prefetcher.get("u", "2026-W40") == {"week": "saved"}
+
+
+def test_invalidate_forces_refetch(executor):
+    fetch = FakeFetch()
+    prefetcher = WeekPrefetcher(fetch, executor)
+    prefetcher.get("u", "2026-W40")
+    prefetcher.invalidate("u", "2026-W40")
+    prefetcher.get("u", "2026-W40")
+    assert len(fetch.calls) == 2
+
+
+WEEKS = ["2026-W01", "2026-W05", "2026-W09", "2026-W20", "2026-W30", "2026-W31", "2026-W40"]
+
+
+def test_neighbours_are_entries_not_calendar_weeks():
+    assert weeks_to_prefetch(WEEKS, "2026-W20") == ["2026-W30", "2026-W09"]
+
+
+def test_browsing_back_fetches_further_back():
+    assert weeks_to_prefetch(WEEKS, "2026-W20", "2026-W30") == [
+        "2026-W30", "2026-W09", "2026-W05", "2026-W01",
+    ]
+
+
+def test_browsing_forward_fetches_further_ahead():
+    assert weeks_to_prefetch(WEEKS, "2026-W05", "2026-W01") == [
+        "2026-W09", "2026-W01", "2026-W20", "2026-W30", "2026-W31",
+    ]
+
+
+def test_ends_of_the_list():
+    assert weeks_to_prefetch(WEEKS, "2026-W01") == ["2026-W05"]
+    assert weeks_to_prefetch(WEEKS, "2026-W40") == ["2026-W31"]
+    assert weeks_to_prefetch(WEEKS, "2026-W41") == []
+
+
+def test_neighbours_across_year_boundary():
+    weeks = ["2026-W52", "2026-W53", "2027-W01", "2027-W02"]
+    assert weeks_to_prefetch(weeks, "2026-W53") == ["2027-W01", "2026-W52"]
+    assert weeks_to_prefetch(weeks, "2027-W01", "2026-W53") == ["2027-W02", "2026-W53"]